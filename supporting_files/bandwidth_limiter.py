@@ -0,0 +1,213 @@
+"""
+Process-wide bandwidth limiter for video uploads.
+
+Uploads to the presigned urls share one token bucket so that parallel uploads cannot saturate the uplink and
+starve the small API calls (logins, registration, drill submissions) of bandwidth.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class BandwidthLimiter:
+    """A thread-safe token bucket shared by all uploads in the process.
+
+    Bytes are granted in the order they are requested, so concurrent uploads reading equal sized chunks get an
+    equal share of the ceiling. While any API call is in flight the upload rate is reduced by `api_reserve` so the
+    control-plane requests always have headroom.
+    """
+
+    def __init__(
+        self,
+        max_bytes_per_second: float | None = None,
+        burst_seconds: float = 0.5,
+        api_reserve: float = 0.25,
+        throughput_window: float = 5.0
+    ):
+        """Initializes the limiter.
+
+        Args:
+            max_bytes_per_second (float, optional): Upload ceiling in bytes per second. None disables throttling. Defaults to None.
+            burst_seconds (float, optional): Seconds worth of bytes that may be sent in a burst after idling. Defaults to 0.5.
+            api_reserve (float, optional): Fraction of the ceiling held back for API calls while they are in flight. Defaults to 0.25.
+            throughput_window (float, optional): Window in seconds used to report achieved throughput. Defaults to 5.0.
+
+        Raises:
+            ValueError: If any of the arguments are out of range.
+        """
+        self._lock = threading.Lock()
+        self._next_send_time = time.monotonic()
+        self._api_in_flight = 0
+        self._active_uploads = 0
+        self._sent = deque()
+        self.throughput_window = throughput_window
+        self.configure(max_bytes_per_second, burst_seconds, api_reserve)
+
+    def configure(self, max_bytes_per_second: float | None, burst_seconds: float = 0.5, api_reserve: float = 0.25):
+        """Changes the ceiling, burst size and API reserve. Takes effect for the next chunk of every upload;
+        slots already handed out to waiting uploads are kept so the link never carries more than the ceiling.
+
+        Args:
+            max_bytes_per_second (float | None): Upload ceiling in bytes per second. None disables throttling.
+            burst_seconds (float, optional): Seconds worth of bytes that may be sent in a burst after idling. Defaults to 0.5.
+            api_reserve (float, optional): Fraction of the ceiling held back for API calls while they are in flight. Defaults to 0.25.
+
+        Raises:
+            ValueError: If any of the arguments are out of range.
+        """
+        if max_bytes_per_second is not None and max_bytes_per_second <= 0:
+            raise ValueError(f"max_bytes_per_second must be positive or None, not {max_bytes_per_second}")
+        if burst_seconds < 0:
+            raise ValueError(f"burst_seconds must not be negative, not {burst_seconds}")
+        if not 0 <= api_reserve < 1:
+            raise ValueError(f"api_reserve must be in [0, 1), not {api_reserve}")
+        with self._lock:
+            self.max_bytes_per_second = max_bytes_per_second
+            self.burst_seconds = burst_seconds
+            self.api_reserve = api_reserve
+
+    def acquire(self, num_bytes: int):
+        """Blocks until `num_bytes` may be sent, then records them towards the reported throughput.
+
+        Args:
+            num_bytes (int): Number of bytes about to be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.max_bytes_per_second
+            if rate is None:
+                send_time = done_time = now
+            else:
+                if self._api_in_flight:
+                    rate *= 1 - self.api_reserve
+                # Reserve the next slot in the shared schedule; callers are served in arrival order.
+                send_time = max(self._next_send_time, now - self.burst_seconds)
+                done_time = send_time + num_bytes / rate
+                self._next_send_time = done_time
+            self._sent.append((max(send_time, now), max(done_time, now), num_bytes))
+
+        delay = send_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def api_call(self):
+        """Context manager marking an API call as in flight so uploads back off while it runs."""
+        with self._lock:
+            self._api_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._api_in_flight -= 1
+
+    @contextmanager
+    def upload(self):
+        """Context manager tracking an upload so the number of active uploads can be reported."""
+        with self._lock:
+            if not self._active_uploads:
+                # Start a fresh measurement so an earlier, separate batch of uploads is not averaged in.
+                self._sent.clear()
+            self._active_uploads += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_uploads -= 1
+
+    @property
+    def active_uploads(self) -> int:
+        """Number of uploads currently in progress."""
+        return self._active_uploads
+
+    def throughput(self) -> float:
+        """Returns the achieved upload throughput in bytes per second over the last `throughput_window` seconds.
+
+        Only bytes whose scheduled send has finished are counted; bytes reserved for a future send time are not.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and self._sent[0][1] < now - self.throughput_window:
+                self._sent.popleft()
+            sent = [(start_time, num_bytes) for start_time, done_time, num_bytes in self._sent if done_time <= now]
+        if not sent:
+            return 0.0
+        span = min(self.throughput_window, now - min(start_time for start_time, _ in sent))
+        if span <= 0:
+            return 0.0
+        return sum(num_bytes for _, num_bytes in sent) / span
+
+
+class ThrottledFile:
+    """Read-only file wrapper that draws every chunk it returns from a BandwidthLimiter.
+
+    Exposes `__len__` so requests still sends a Content-Length header instead of chunked encoding, which presigned
+    S3 urls do not accept.
+    """
+
+    def __init__(self, file, size: int, limiter: BandwidthLimiter, chunk_size: int = 64 * 1024):
+        self._file = file
+        self._size = size
+        self._limiter = limiter
+        self._chunk_size = chunk_size
+
+    def __len__(self):
+        return self._size
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        # Lets requests rewind the body when it follows a 307/308 redirect.
+        return self._file.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(self._chunk_size)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        chunk = self._file.read(min(size, self._chunk_size))
+        if chunk:
+            self._limiter.acquire(len(chunk))
+        return chunk
+
+
+def _limit_from_env() -> float | None:
+    """Reads the upload ceiling in bytes per second from SNOC_UPLOAD_BANDWIDTH_LIMIT, if set. Zero or less means no limit."""
+    value = os.environ.get("SNOC_UPLOAD_BANDWIDTH_LIMIT")
+    if not value:
+        return None
+    try:
+        limit = float(value)
+    except ValueError:
+        logger.warning(f"Ignoring SNOC_UPLOAD_BANDWIDTH_LIMIT={value!r}, expected bytes per second")
+        return None
+    return limit if limit > 0 else None
+
+
+upload_limiter = BandwidthLimiter(_limit_from_env())
+
+
+def set_upload_bandwidth_limit(max_bytes_per_second: float | None, burst_seconds: float = 0.5, api_reserve: float = 0.25):
+    """Sets the ceiling shared by all uploads to presigned urls.
+
+    Args:
+        max_bytes_per_second (float | None): Upload ceiling in bytes per second. None disables throttling.
+        burst_seconds (float, optional): Seconds worth of bytes that may be sent in a burst after idling. Defaults to 0.5.
+        api_reserve (float, optional): Fraction of the ceiling held back for API calls while they are in flight. Defaults to 0.25.
+    """
+    upload_limiter.configure(max_bytes_per_second, burst_seconds, api_reserve)
+    logger.info(f"Upload bandwidth limit set to {max_bytes_per_second} bytes/s (api reserve {api_reserve:.0%})")
+
+
+def get_upload_throughput() -> float:
+    """Returns the achieved upload throughput in bytes per second across all uploads."""
+    return upload_limiter.throughput()
@@ -1,4 +1,9 @@
+import os
+import time
 import logging
+
+from supporting_files.bandwidth_limiter import ThrottledFile, upload_limiter
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -34,12 +39,13 @@ def app_login(email: str,  password: str, person: str, env="stage"):
 
     if env not in ["stage", "prod"]:
         raise ValueError(f"env must be 'stage' or 'prod', not {env}")
-    if env == "stage":
-        data = {"email": email, "password": password, "fcmToken": "fcmToken"}
-        logger.debug(f"Data for login request: {data}")
-        response = requests.post(f"{STAGE_URL}/api/v2/{user_login}/login", json=data)
-    else:
-        response = requests.post(f"{PROD_URL}/api/v2/{user_login}/login", json={"email": email, "password": password, "fcmToken": "fcmToken"})
+    with upload_limiter.api_call():
+        if env == "stage":
+            data = {"email": email, "password": password, "fcmToken": "fcmToken"}
+            logger.debug(f"Data for login request: {data}")
+            response = requests.post(f"{STAGE_URL}/api/v2/{user_login}/login", json=data)
+        else:
+            response = requests.post(f"{PROD_URL}/api/v2/{user_login}/login", json={"email": email, "password": password, "fcmToken": "fcmToken"})
     logger.debug(f"Response from login: {response.json()}")
     return response
 
@@ -64,7 +70,8 @@ def refresh_tokens(user_id: int, env: str = "stage"):
         raise ValueError(f"env must be 'stage' or 'prod', not {env}")
 
     url = f"{STAGE_URL if env == 'stage' else PROD_URL}/api/v2/users/{user_id}/refreshtokens"
-    return requests.post(url, headers={})
+    with upload_limiter.api_call():
+        return requests.post(url, headers={})
 
 
 
@@ -95,26 +102,39 @@ def get_presigned_upload_url(
     stage = f"{STAGE_URL}/api/v2/files/uploadurl"
     prod = f"{PROD_URL}/api/v2/files/uploadurl"
 
-    if env == "stage":
-        return requests.get(stage, headers=headers, params=params)
-    else:
-        return requests.get(prod, headers=headers, params=params)
+    with upload_limiter.api_call():
+        if env == "stage":
+            return requests.get(stage, headers=headers, params=params)
+        else:
+            return requests.get(prod, headers=headers, params=params)
 
 
 def put_presigned_upload_url(url: str, file_path: str, video_content_type: str):
     """Uploads a .mp4 file to a presigned url.
 
+    The file is streamed through the shared upload bandwidth limiter, see `bandwidth_limiter.set_upload_bandwidth_limit`.
+
     Args:
         url (str): The presigned url.
         file_path (str): The path to the file to upload.
+        video_content_type (str): The mime type of the file.
 
     Returns:
         response: Response object from the request.
     """
     headers = {"Content-Type": video_content_type}
-    with open(file_path, "rb") as f:
-        file = f.read()
-    return requests.put(url, data=file, headers=headers)
+    file_size = os.path.getsize(file_path)
+    start_time = time.monotonic()
+    with open(file_path, "rb") as f, upload_limiter.upload():
+        response = requests.put(url, data=ThrottledFile(f, file_size, upload_limiter), headers=headers)
+        active_uploads = upload_limiter.active_uploads
+        total_throughput = upload_limiter.throughput()
+    duration = time.monotonic() - start_time
+    logger.info(
+        f"Uploaded {file_size} bytes in {duration:.1f}s ({file_size / max(duration, 1e-6) / 1e6:.2f} MB/s), "
+        f"total upload throughput {total_throughput / 1e6:.2f} MB/s across {active_uploads} active uploads"
+    )
+    return response
 
 
 def submit_drill_entry(
@@ -144,7 +164,8 @@ def submit_drill_entry(
         url = f"{PROD_URL}/api/v2/players/{str(player_id)}/trials/{str(trial_id)}/entries"
     headers = {"Authorization": f"Bearer {bearer_token}"}
     body = {"videoEntryRelativePath": video_entry_relative_path, "measurementFactValue": ball_size}
-    return requests.post(url, headers=headers, json=body)
+    with upload_limiter.api_call():
+        return requests.post(url, headers=headers, json=body)
 
 def get_drill_entry(player_id: int, drill_id: int, entry_id: int, bearer_token: str, include_feedback: bool = True, env: str = "stage"):
     """Get a drill entry.
@@ -177,4 +198,5 @@ def get_drill_entry(player_id: int, drill_id: int, entry_id: int, bearer_token:
 
     logger.debug(f"URL for get drill entry: {url}")
     headers = {"Authorization": f"Bearer {bearer_token}"}
-    return requests.get(url, headers=headers)
+    with upload_limiter.api_call():
+        return requests.get(url, headers=headers)
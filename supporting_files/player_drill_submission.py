@@ -13,6 +13,7 @@ from supporting_files.player_drill_entry_endpoints import (
     submit_drill_entry,
     get_drill_entry
 )
+from supporting_files.bandwidth_limiter import upload_limiter
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
@@ -81,10 +82,11 @@ class PlayerAPIClient:
         body = {"email": email, "password": password, "fcmToken": "fcmToken"}
         logger.debug(f"Request BODY: {body}")
 
-        response = requests.post(
-            f"{base_url}/api/v2/{user_login}/login",
-            json=body
-        )
+        with upload_limiter.api_call():
+            response = requests.post(
+                f"{base_url}/api/v2/{user_login}/login",
+                json=body
+            )
         logger.debug(f"JSON Body from login: {response.json()}")
         
         return response
@@ -2,6 +2,8 @@ import requests
 import json
 import logging
 
+from supporting_files.bandwidth_limiter import upload_limiter
+
 logger = logging.getLogger(__name__)
 
 class RegistrationClient:
@@ -12,7 +14,8 @@ class RegistrationClient:
     def _request(self, method, endpoint, **kwargs):
         url = f"{self.base_url}{endpoint}"
         try:
-            response = method(url, **kwargs)
+            with upload_limiter.api_call():
+                response = method(url, **kwargs)
             response.raise_for_status()
             return response
         except requests.exceptions.HTTPError as err:
@@ -151,7 +154,8 @@ def add_academy_team_to_player(academy_team_id: int, player_id: int, env: str) -
     url = f"{base_url}{endpoint}"
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        with upload_limiter.api_call():
+            response = requests.post(url, headers=headers, json=payload)
         response.raise_for_status()
         return response
     except requests.exceptions.HTTPError as err: